@@ -1,30 +1,171 @@
-from flask import Flask, jsonify, request
+from flask import Flask, Response, request, stream_with_context
+from flask_migrate import Migrate, upgrade
 from flask_sqlalchemy import SQLAlchemy
-from datetime import datetime
-from flasgger import Swagger
+from sqlalchemy import event as sa_event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+from datetime import datetime, timezone
 from enum import Enum
+import cbor2
+import hashlib
+import msgpack
+import orjson
+import os
+import re
 
 app = Flask(__name__)
-Swagger(app)
 
 app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///eventList.db'
-db = SQLAlchemy(app)
+# One pooled connection per gunicorn thread (WEB_THREADS, shared with gunicorn.conf.py);
+# overflow covers streamed responses and servers with more threads, like `flask run`.
+WEB_THREADS = int(os.environ.get('WEB_THREADS', 8))
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+    'poolclass': QueuePool,
+    'pool_size': WEB_THREADS,
+    'max_overflow': WEB_THREADS,
+    'connect_args': {'check_same_thread': False, 'timeout': 30},
+}
+db = SQLAlchemy(app, session_options={"expire_on_commit": False, "autoflush": False})
+migrate = Migrate(app, db, render_as_batch=True)
+
+@sa_event.listens_for(Engine, 'connect')
+def set_sqlite_pragma(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute('PRAGMA journal_mode=WAL')
+    cursor.execute('PRAGMA synchronous=NORMAL')
+    cursor.execute('PRAGMA temp_store=MEMORY')
+    cursor.execute('PRAGMA mmap_size=268435456')
+    cursor.close()
+
+if app.debug:
+    from flasgger import Swagger
+    from nplusone.ext.flask_sqlalchemy import NPlusOne
+    Swagger(app)
+    NPlusOne(app)
 
 class Event(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(200), nullable=False)
     match_time = db.Column(db.DateTime, default=datetime.utcnow)
     mix10 = db.Column(db.Boolean, default=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (db.Index('ix_event_match_time', 'match_time'),)
 
 class Team(Enum):
     CT = 'CT'
     TT = 'TT'
 
+_TEAM_NAMES = frozenset(Team.__members__)
+
 class Player(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(200), nullable=False)
     event_id = db.Column(db.Integer, db.ForeignKey('event.id'), nullable=False)
-    team = db.Column(db.Enum(Team), default=None, nullable=True)
+    team = db.Column(db.String(2), default=None, nullable=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    event = db.relationship('Event', lazy='raise')
+
+    __table_args__ = (db.Index('ix_player_cover', 'event_id', 'name', 'team'),)
+
+def _json_default(obj):
+    if isinstance(obj, Enum):
+        return obj.value
+    raise TypeError
+
+def _msgpack_default(obj):
+    # Stored datetimes are naive UTC; msgpack only packs aware ones as timestamps.
+    if isinstance(obj, datetime):
+        return msgpack.Timestamp.from_datetime(obj.replace(tzinfo=timezone.utc))
+    raise TypeError
+
+_MIMETYPES = ['application/json', 'application/cbor', 'application/msgpack']
+
+_ISO_RE = re.compile(r'\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}')
+
+def parse_match_time(value):
+    if not isinstance(value, str) or not _ISO_RE.fullmatch(value):
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return None
+
+def validate_player(data):
+    # Returns the error message for an invalid player dict, or None when it is valid.
+    name = data.get('name')
+    if not isinstance(name, str) or not name:
+        return 'Invalid name'
+    event_id = data.get('event_id')
+    if not isinstance(event_id, int) or isinstance(event_id, bool):
+        return 'Invalid event_id'
+    team = data.get('team')
+    if team not in (None, '') and (not isinstance(team, str) or team not in _TEAM_NAMES):
+        return 'Invalid team'
+    return None
+
+def event_to_dict(row):
+    return {'id': row[0], 'name': row[1], 'match_time': row[2], 'mix10': row[3]}
+
+def player_to_dict(row):
+    return {'id': row[0], 'name': row[1], 'event_id': row[2], 'team': row[3]}
+
+def load_json_body():
+    try:
+        return orjson.loads(request.get_data(cache=False))
+    except orjson.JSONDecodeError:
+        return None
+
+def make_json_response(data, status=200):
+    return Response(orjson.dumps(data, default=_json_default), status=status, mimetype='application/json')
+
+def negotiate_mimetype():
+    return request.accept_mimetypes.best_match(_MIMETYPES) or 'application/json'
+
+def serialize(data, mimetype):
+    if mimetype == 'application/cbor':
+        return cbor2.dumps(data, timezone=timezone.utc)
+    if mimetype == 'application/msgpack':
+        return msgpack.packb(data, default=_msgpack_default)
+    return orjson.dumps(data, default=_json_default)
+
+def make_data_response(data):
+    mimetype = negotiate_mimetype()
+    response = Response(serialize(data, mimetype), mimetype=mimetype)
+    response.vary.add('Accept')
+    return response
+
+def list_etag(model, mimetype):
+    count, max_updated = db.session.execute(db.select(db.func.count(), db.func.max(model.updated_at)).select_from(model)).one()
+    return hashlib.blake2b(f'{mimetype}:{count}:{max_updated}'.encode(), digest_size=8).hexdigest()
+
+def make_list_response(model, stmt, to_dict):
+    mimetype = negotiate_mimetype()
+    tag = list_etag(model, mimetype)
+    if request.if_none_match.contains(tag):
+        response = Response(status=304)
+    else:
+        result = db.session.execute(stmt.execution_options(yield_per=1000))
+        if mimetype == 'application/json':
+            response = make_json_stream_response(result, to_dict)
+        else:
+            response = Response(serialize(list(map(to_dict, result)), mimetype), mimetype=mimetype)
+    response.set_etag(tag)
+    response.vary.add('Accept')
+    response.cache_control.private = True
+    response.cache_control.max_age = 0
+    response.cache_control.must_revalidate = True
+    return response
+
+def make_json_stream_response(result, to_dict):
+    def generate():
+        yield b'['
+        separator = b''
+        for partition in result.partitions():
+            yield separator + orjson.dumps(list(map(to_dict, partition)), default=_json_default)[1:-1]
+            separator = b','
+        yield b']'
+    return Response(stream_with_context(generate()), mimetype='application/json')
 
 @app.route('/api/event', methods=['GET'])
 def get_all_events():
@@ -36,10 +177,10 @@ def get_all_events():
     responses:
       200:
         description: A list of existing events
+      304:
+        description: Event list has not changed since the given ETag
     """
-    events = Event.query.all()
-    event_list = [{"id": event.id, "name": event.name, "match_time": event.match_time, "mix10": event.mix10} for event in events]
-    return jsonify(event_list)
+    return make_list_response(Event, db.select(Event.id, Event.name, Event.match_time, Event.mix10), event_to_dict)
 
 @app.route('/api/event', methods=['POST'])
 def create_event():
@@ -49,35 +190,56 @@ def create_event():
     tags:
       - Event API
     parameters:
-      - name: name
-        in: formData
-        type: string
-        required: true
-        description: Event name
-      - name: match_time
-        in: formData
-        type: string
+      - name: body
+        in: body
         required: true
-        description: Event match time in format "YYYY-MM-DDTHH:MM:SS"
-      - name: mix10
-        in: formData
-        type: boolean
-        required: false
-        description: Boolean indicating if event is mix10
+        description: Event to create
+        schema:
+          type: object
+          required:
+            - name
+            - match_time
+          properties:
+            name:
+              type: string
+              description: Event name
+            match_time:
+              type: string
+              description: Event match time in format "YYYY-MM-DDTHH:MM:SS"
+            mix10:
+              type: boolean
+              description: Boolean indicating if event is mix10
     responses:
       201:
         description: Event created successfully
+      400:
+        description: Invalid JSON body, name, match time or mix10 flag
     """
-    data = request.form
+    data = load_json_body()
+
+    if not isinstance(data, dict):
+        return make_json_response({'message': 'Invalid JSON body'}, 400)
+
     event_name = data.get('name')
+
+    if not isinstance(event_name, str) or not event_name:
+        return make_json_response({'message': 'Invalid name'}, 400)
+
     match_time_string = data.get('match_time')
-    match_time = datetime.strptime(match_time_string, '%Y-%m-%dT%H:%M:%S')
+    match_time = parse_match_time(match_time_string)
+
+    if match_time is None:
+        return make_json_response({'message': 'Invalid match_time'}, 400)
+
     mix10 = data.get('mix10', False)
 
+    if not isinstance(mix10, bool):
+        return make_json_response({'message': 'Invalid mix10'}, 400)
+
     new_event = Event(name=event_name, match_time=match_time, mix10=mix10)
     db.session.add(new_event)
     db.session.commit()
-    return jsonify({'message': 'Event added successfully'}), 201
+    return make_json_response({'message': 'Event added successfully'}, 201)
 
 @app.route('/api/event/<int:event_id>', methods=['GET'])
 def get_event(event_id):
@@ -101,9 +263,9 @@ def get_event(event_id):
     event = Event.query.get(event_id)
 
     if not event:
-        return jsonify({'message': 'Event not found'}), 404
+        return make_json_response({'message': 'Event not found'}, 404)
     
-    return jsonify({'id': event.id, 'name': event.name, "match_time": event.match_time, "mix10": event.mix10})
+    return make_data_response({'id': event.id, 'name': event.name, "match_time": event.match_time, "mix10": event.mix10})
 
 @app.route('/api/event/<int:event_id>', methods=['PUT'])
 def update_event(event_id):
@@ -118,43 +280,61 @@ def update_event(event_id):
         type: integer
         required: true
         description: Event ID
-      - name: name
-        in: formData
-        type: string
-        required: true
-        description: New event name
-      - name: match_time
-        in: formData
-        type: string
+      - name: body
+        in: body
         required: true
-        description: New event match time in format "YYYY-MM-DDTHH:MM:SS"
-      - name: mix10
-        in: formData
-        type: boolean
-        required: false
-        description: New boolean indicating if event is mix10
+        description: New event details
+        schema:
+          type: object
+          required:
+            - name
+            - match_time
+          properties:
+            name:
+              type: string
+              description: New event name
+            match_time:
+              type: string
+              description: New event match time in format "YYYY-MM-DDTHH:MM:SS"
+            mix10:
+              type: boolean
+              description: New boolean indicating if event is mix10
     responses:
       200:
         description: Event updated successfully
+      400:
+        description: Invalid JSON body, name, match time or mix10 flag
       404:
         description: Event not found
     """
-    event = Event.query.get(event_id)
+    data = load_json_body()
 
-    if not event:
-        return jsonify({'message': 'Event not found'}), 404
+    if not isinstance(data, dict):
+        return make_json_response({'message': 'Invalid JSON body'}, 400)
 
-    data = request.form
     new_name = data.get('name')
+
+    if not isinstance(new_name, str) or not new_name:
+        return make_json_response({'message': 'Invalid name'}, 400)
+
     new_time_string = data.get('match_time')
-    new_time = datetime.strptime(new_time_string, '%Y-%m-%dT%H:%M:%S')
+    new_time = parse_match_time(new_time_string)
+
+    if new_time is None:
+        return make_json_response({'message': 'Invalid match_time'}, 400)
+
     mix10 = data.get('mix10', False)
 
-    event.match_time = new_time
-    event.name = new_name
-    event.mix10 = mix10
+    if not isinstance(mix10, bool):
+        return make_json_response({'message': 'Invalid mix10'}, 400)
+
+    result = db.session.execute(db.update(Event).where(Event.id == event_id).values(name=new_name, match_time=new_time, mix10=mix10))
+
+    if result.rowcount == 0:
+        return make_json_response({'message': 'Event not found'}, 404)
+
     db.session.commit()
-    return jsonify({'message': 'Event updated successfully'})
+    return make_json_response({'message': 'Event updated successfully'})
 
 @app.route('/api/event/<int:event_id>', methods=['DELETE'])
 def delete_event(event_id):
@@ -175,14 +355,13 @@ def delete_event(event_id):
       404:
         description: Event not found
     """
-    event = Event.query.get(event_id)
+    result = db.session.execute(db.delete(Event).where(Event.id == event_id))
+
+    if result.rowcount == 0:
+        return make_json_response({'message': 'Event not found'}, 404)
 
-    if not event:
-        return jsonify({'message': 'Event not found'}), 404
-    
-    db.session.delete(event)
     db.session.commit()
-    return jsonify({'message': 'Event deleted successfully'})
+    return make_json_response({'message': 'Event deleted successfully'})
 
 @app.route('/api/player', methods=['GET'])
 def get_all_players():
@@ -194,10 +373,10 @@ def get_all_players():
     responses:
       200:
         description: A list of players
+      304:
+        description: Player list has not changed since the given ETag
     """
-    players = Player.query.all()
-    player_list = [{"id": player.id, "name": player.name, "event_id": player.event_id, "team": player.team.value if player.team else None} for player in players]
-    return jsonify(player_list)
+    return make_list_response(Player, db.select(Player.id, Player.name, Player.event_id, Player.team), player_to_dict)
 
 @app.route('/api/player/<int:player_id>', methods=['GET'])
 def get_player(player_id):
@@ -221,9 +400,9 @@ def get_player(player_id):
     player = Player.query.get(player_id)
 
     if not player:
-        return jsonify({'message': 'Player not found'}), 404
+        return make_json_response({'message': 'Player not found'}, 404)
     
-    return jsonify({'id': player.id, 'name': player.name, "event_id": player.event_id, "team": player.team.value if player.team else None})
+    return make_data_response({'id': player.id, 'name': player.name, "event_id": player.event_id, "team": player.team})
 
 @app.route('/api/player', methods=['POST'])
 def create_player():
@@ -233,34 +412,98 @@ def create_player():
     tags:
       - Player API
     parameters:
-      - name: name
-        in: formData
-        type: string
-        required: true
-        description: Player name
-      - name: event_id
-        in: formData
-        type: integer
+      - name: body
+        in: body
         required: true
-        description: Event ID to associate with the player
-      - name: team
-        in: formData
-        type: string
-        required: false
-        description: Team name (CT or TT)
+        description: Player to create
+        schema:
+          type: object
+          required:
+            - name
+            - event_id
+          properties:
+            name:
+              type: string
+              description: Player name
+            event_id:
+              type: integer
+              description: Event ID to associate with the player
+            team:
+              type: string
+              description: Team name (CT or TT)
     responses:
       201:
         description: Player created successfully
+      400:
+        description: Invalid JSON body, name, event ID or team
     """
-    data = request.form
-    player_name = data.get('name')
-    event_id = data.get('event_id')
-    team = data.get('team')
+    data = load_json_body()
+
+    if not isinstance(data, dict):
+        return make_json_response({'message': 'Invalid JSON body'}, 400)
+
+    error = validate_player(data)
+
+    if error:
+        return make_json_response({'message': error}, 400)
 
-    new_player = Player(name=player_name, event_id=event_id, team=Team[team] if team else None)
+    new_player = Player(name=data['name'], event_id=data['event_id'], team=data.get('team') or None)
     db.session.add(new_player)
     db.session.commit()
-    return jsonify({'message': 'Player added successfully'}), 201
+    return make_json_response({'message': 'Player added successfully'}, 201)
+
+@app.route('/api/player/bulk', methods=['POST'])
+def create_players_bulk():
+    """
+    Create several players in a single transaction
+    ---
+    tags:
+      - Player API
+    parameters:
+      - name: players
+        in: body
+        required: true
+        description: List of players to create
+        schema:
+          type: array
+          items:
+            type: object
+            required:
+              - name
+              - event_id
+            properties:
+              name:
+                type: string
+                description: Player name
+              event_id:
+                type: integer
+                description: Event ID to associate with the player
+              team:
+                type: string
+                description: Team name (CT or TT)
+    responses:
+      201:
+        description: Players created successfully
+      400:
+        description: Invalid player list, name, event ID or team
+    """
+    payload = load_json_body()
+
+    if not isinstance(payload, list):
+        return make_json_response({'message': 'Invalid player list'}, 400)
+
+    for p in payload:
+        if not isinstance(p, dict):
+            return make_json_response({'message': 'Invalid player list'}, 400)
+
+        error = validate_player(p)
+
+        if error:
+            return make_json_response({'message': error}, 400)
+
+    db.session.bulk_insert_mappings(Player, [{"name": p["name"], "event_id": p["event_id"], "team": p.get("team") or None} for p in payload])
+    db.session.commit()
+    return make_json_response({'message': 'Players added successfully'}, 201)
 
 @app.route('/api/player/<int:player_id>', methods=['PUT'])
 def update_player(player_id):
@@ -275,42 +518,50 @@ def update_player(player_id):
         type: integer
         required: true
         description: Player ID
-      - name: name
-        in: formData
-        type: string
+      - name: body
+        in: body
         required: true
-        description: New player name
-      - name: event_id
-        in: formData
-        type: integer
-        required: true
-        description: New event ID to associate with the player
-      - name: team
-        in: formData
-        type: string
-        required: false
-        description: New team name (CT or TT)
+        description: New player details
+        schema:
+          type: object
+          required:
+            - name
+            - event_id
+          properties:
+            name:
+              type: string
+              description: New player name
+            event_id:
+              type: integer
+              description: New event ID to associate with the player
+            team:
+              type: string
+              description: New team name (CT or TT)
     responses:
       200:
         description: Player updated successfully
+      400:
+        description: Invalid JSON body, name, event ID or team
       404:
         description: Player not found
     """
-    player = Player.query.get(player_id)
+    data = load_json_body()
 
-    if not player:
-        return jsonify({'message': 'Player not found'}), 404
+    if not isinstance(data, dict):
+        return make_json_response({'message': 'Invalid JSON body'}, 400)
 
-    data = request.form
-    new_name = data.get('name')
-    new_event_id = data.get('event_id')
-    new_team = data.get('team')
+    error = validate_player(data)
+
+    if error:
+        return make_json_response({'message': error}, 400)
+
+    result = db.session.execute(db.update(Player).where(Player.id == player_id).values(name=data['name'], event_id=data['event_id'], team=data.get('team') or None))
+
+    if result.rowcount == 0:
+        return make_json_response({'message': 'Player not found'}, 404)
 
-    player.name = new_name
-    player.event_id = new_event_id
-    player.team = Team[new_team] if new_team else None
     db.session.commit()
-    return jsonify({'message': 'Player updated successfully'})
+    return make_json_response({'message': 'Player updated successfully'})
 
 @app.route('/api/player/<int:player_id>', methods=['DELETE'])
 def delete_player(player_id):
@@ -331,17 +582,19 @@ def delete_player(player_id):
       404:
         description: Player not found
     """
-    player = Player.query.get(player_id)
+    result = db.session.execute(db.delete(Player).where(Player.id == player_id))
+
+    if result.rowcount == 0:
+        return make_json_response({'message': 'Player not found'}, 404)
 
-    if not player:
-        return jsonify({'message': 'Player not found'}), 404
-    
-    db.session.delete(player)
     db.session.commit()
-    return jsonify({'message': 'Player deleted successfully'})
+    return make_json_response({'message': 'Player deleted successfully'})
+
+@app.cli.command('init-db')
+def init_db():
+    """Create or upgrade the database tables."""
+    upgrade()
 
 
 if __name__ == "__main__":
-    with app.app_context():
-        db.create_all()
-    app.run(debug=True, use_reloader=True)
\ No newline at end of file
+    app.run()
\ No newline at end of file
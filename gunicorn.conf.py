@@ -0,0 +1,8 @@
+import multiprocessing
+import os
+
+wsgi_app = 'app:app'
+bind = '0.0.0.0:8000'
+workers = multiprocessing.cpu_count()
+worker_class = 'gthread'
+threads = int(os.environ.get('WEB_THREADS', 8))
@@ -0,0 +1,46 @@
+"""create event and player tables
+
+Revision ID: 1b5f35d88f9b
+Revises: 
+Create Date: 2026-10-15 21:41:37.972848
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1b5f35d88f9b'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Databases created with db.create_all() before migrations existed already
+    # have these tables; leave them in place so they can be upgraded as-is.
+    existing = sa.inspect(op.get_bind()).get_table_names()
+
+    if 'event' not in existing:
+        op.create_table('event',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('name', sa.String(length=200), nullable=False),
+            sa.Column('match_time', sa.DateTime(), nullable=True),
+            sa.Column('mix10', sa.Boolean(), nullable=True),
+            sa.PrimaryKeyConstraint('id')
+        )
+
+    if 'player' not in existing:
+        op.create_table('player',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('name', sa.String(length=200), nullable=False),
+            sa.Column('event_id', sa.Integer(), nullable=False),
+            sa.Column('team', sa.String(length=2), nullable=True),
+            sa.ForeignKeyConstraint(['event_id'], ['event.id'], ),
+            sa.PrimaryKeyConstraint('id')
+        )
+
+
+def downgrade():
+    op.drop_table('player')
+    op.drop_table('event')
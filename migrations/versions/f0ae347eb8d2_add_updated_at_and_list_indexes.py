@@ -0,0 +1,45 @@
+"""add updated_at and list indexes
+
+Revision ID: f0ae347eb8d2
+Revises: 1b5f35d88f9b
+Create Date: 2026-10-15 21:41:40.073893
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f0ae347eb8d2'
+down_revision = '1b5f35d88f9b'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+
+    for table in ('event', 'player'):
+        columns = {column['name'] for column in inspector.get_columns(table)}
+        if 'updated_at' not in columns:
+            with op.batch_alter_table(table, schema=None) as batch_op:
+                batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+        op.execute(sa.text(f'UPDATE {table} SET updated_at = CURRENT_TIMESTAMP WHERE updated_at IS NULL'))
+
+    if 'ix_event_match_time' not in {index['name'] for index in inspector.get_indexes('event')}:
+        with op.batch_alter_table('event', schema=None) as batch_op:
+            batch_op.create_index('ix_event_match_time', ['match_time'], unique=False)
+
+    if 'ix_player_cover' not in {index['name'] for index in inspector.get_indexes('player')}:
+        with op.batch_alter_table('player', schema=None) as batch_op:
+            batch_op.create_index('ix_player_cover', ['event_id', 'name', 'team'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('player', schema=None) as batch_op:
+        batch_op.drop_index('ix_player_cover')
+        batch_op.drop_column('updated_at')
+
+    with op.batch_alter_table('event', schema=None) as batch_op:
+        batch_op.drop_index('ix_event_match_time')
+        batch_op.drop_column('updated_at')